@@ -1,58 +1,69 @@
+import array
 import asyncio
 import base64
+import bisect
+import gzip
 import hashlib
 import json
 import secrets
 import string
+import struct
 import time
+import zlib
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback, same compact UTF-8 output
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
 
 app = FastAPI()
 
 # ----------------------------
 # Deterministic PRNG + shuffle
-# SplitMix64 (same algorithm in JS for verification)
+# SplitMix64 + Fisher-Yates; the SplitMix64 class and deterministicShuffleJS
+# in the page script are the reference the browser audits against
 # ----------------------------
 MASK64 = (1 << 64) - 1
 
-def _u64(x: int) -> int:
-    return x & MASK64
-
-class SplitMix64:
-    def __init__(self, seed_u64: int):
-        self.state = _u64(seed_u64)
-
-    def next_u64(self) -> int:
-        self.state = _u64(self.state + 0x9E3779B97F4A7C15)
-        z = self.state
-        z = _u64((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9)
-        z = _u64((z ^ (z >> 27)) * 0x94D049BB133111EB)
-        return _u64(z ^ (z >> 31))
-
-    def randbelow(self, n: int) -> int:
-        # Rejection sampling for unbiased modulo
-        if n <= 0:
-            raise ValueError("n must be > 0")
-        limit = (1 << 64) - ((1 << 64) % n)
+@lru_cache(maxsize=1024)
+def _shuffle_indices(seed_u64: int, n: int) -> bytes:
+    # SplitMix64 + Fisher-Yates fused into one loop over a uint8 index
+    # permutation (n <= 256). Must match deterministicShuffleJS draw for draw:
+    # Lemire's multiply-shift, rejecting low words below 2**64 % bound. The
+    # result is immutable, so repeat hands on the same master seed reuse it.
+    perm = bytearray(range(n))
+    state = seed_u64 & MASK64
+    for i in range(n - 1, 0, -1):
+        bound = i + 1
+        threshold = -1
         while True:
-            r = self.next_u64()
-            if r < limit:
-                return r % n
-
-def deterministic_shuffle(items: List[str], master_seed_bytes: bytes) -> List[str]:
-    # Take first 8 bytes as u64 seed
-    seed_u64 = int.from_bytes(master_seed_bytes[:8], "big", signed=False)
-    rng = SplitMix64(seed_u64)
-    arr = items[:]
-    # Fisher-Yates
-    for i in range(len(arr) - 1, 0, -1):
-        j = rng.randbelow(i + 1)
-        arr[i], arr[j] = arr[j], arr[i]
-    return arr
+            state = (state + 0x9E3779B97F4A7C15) & MASK64
+            z = ((state ^ (state >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+            m = (z ^ (z >> 31)) * bound
+            low = m & MASK64
+            if low >= bound:
+                break
+            if threshold < 0:
+                threshold = ((1 << 64) - bound) % bound
+            if low >= threshold:
+                break
+        j = m >> 64
+        perm[i], perm[j] = perm[j], perm[i]
+    return bytes(perm)
+
+_SEED_U64 = struct.Struct(">Q")
 
 # ----------------------------
 # Poker deck utilities
@@ -60,23 +71,60 @@ def deterministic_shuffle(items: List[str], master_seed_bytes: bytes) -> List[st
 RANKS = ["A","K","Q","J","10","9","8","7","6","5","4","3","2"]
 SUITS = ["♠","♥","♦","♣"]
 
-def make_deck() -> List[str]:
-    return [r + s for s in SUITS for r in RANKS]
+# Cards are ids 0..51 on the server and on the wire, numbered suit by suit
+# in RANKS order; only the client (makeDeck) turns them into labels.
+DECK_SIZE = len(RANKS) * len(SUITS)
 
-def sha256_hex(s: str) -> str:
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+def shuffled_deck(master_seed_bytes: bytes) -> bytes:
+    # First 8 bytes (big-endian) of the master seed are the u64 seed.
+    # Shuffling the unshuffled deck 0..51 yields the permutation itself,
+    # so the card ids come straight out of the kernel, one byte each.
+    return _shuffle_indices(_SEED_U64.unpack_from(master_seed_bytes)[0], DECK_SIZE)
+
+# hashlib is backed by OpenSSL, which already uses SHA-NI where the CPU has
+# it; the Python-side cost is hasher setup and string building, so copy an
+# initialised hasher and feed the pieces straight in. The prototype is never
+# updated, so sharing it across threads is safe.
+_SHA_PROTO = hashlib.sha256()
 
-def sha256_bytes(b: bytes) -> bytes:
-    return hashlib.sha256(b).digest()
+def sha256_hex(s: str) -> str:
+    h = _SHA_PROTO.copy()
+    h.update(s.encode("utf-8"))
+    return h.hexdigest()
+
+def commitment_digest(seed: bytes, salt: bytes) -> bytes:
+    # sha256(seed + "|" + salt) without building the joined string
+    h = _SHA_PROTO.copy()
+    h.update(seed)
+    h.update(b"|")
+    h.update(salt)
+    return h.digest()
+
+def deck_digest(deck: bytes) -> bytes:
+    # blake2b-256 over the 52 card-id bytes. The deck hash is only displayed
+    # by clients, so it can use the faster hash; anything the browser
+    # recomputes (commitments, master seed) stays SHA-256.
+    return hashlib.blake2b(deck, digest_size=32).digest()
+
+_ROOM_ALPHABET = (string.ascii_uppercase + string.digits).encode("ascii")  # 36 symbols
 
 def room_code(n=6) -> str:
-    alphabet = string.ascii_uppercase + string.digits
-    return "".join(secrets.choice(alphabet) for _ in range(n))
+    # One CSPRNG read per round instead of one per character. Only bytes whose
+    # low 6 bits fall below 36 are kept, so every symbol stays equally likely.
+    out = bytearray()
+    while len(out) < n:
+        for b in secrets.token_bytes(2 * n):
+            v = b & 0x3F
+            if v < 36:
+                out.append(_ROOM_ALPHABET[v])
+                if len(out) == n:
+                    break
+    return out.decode("ascii")
 
 # ----------------------------
 # Room state
 # ----------------------------
-@dataclass
+@dataclass(slots=True)
 class Player:
     pid: str
     name: str
@@ -84,15 +132,40 @@ class Player:
     ws: Optional[WebSocket] = None
     is_host: bool = False
 
+    # outbound frames, drained by this player's writer task
+    out_queue: Optional[asyncio.Queue] = field(default=None, repr=False)
+    writer: Optional[asyncio.Task] = field(default=None, repr=False)
+
     # fairness fields
-    commitment: Optional[str] = None  # public
-    seed: Optional[str] = None        # private to server until audit
-    salt: Optional[str] = None        # private to server until audit
+    # kept as raw bytes; hex/str only at the JSON boundary
+    commitment: Optional[bytes] = None  # public, 32-byte digest
+    seed: Optional[bytes] = None        # private to server until audit (UTF-8)
+    salt: Optional[bytes] = None        # private to server until audit (UTF-8)
+    _revealed: bool = field(default=False, init=False, repr=False)  # seed and salt both set
 
     # hand
-    hole: List[str] = field(default_factory=list)
+    hole: List[int] = field(default_factory=list)
 
-@dataclass
+def _index_array() -> array.array:
+    return array.array("B")
+
+@dataclass(slots=True)
+class Transcript:
+    # Deck positions dealt this hand, kept as packed uint8 arrays
+    variant: str = "TEXAS"
+    holes: Dict[str, array.array] = field(default_factory=dict)
+    community_indices: array.array = field(default_factory=_index_array)
+    created_at: float = field(default_factory=time.time)
+
+    def to_json(self) -> dict:
+        return {
+            "variant": self.variant,
+            "holes": {pid: idx.tolist() for pid, idx in self.holes.items()},
+            "community_indices": self.community_indices.tolist(),
+            "created_at": self.created_at,
+        }
+
+@dataclass(slots=True)
 class Room:
     code: str
     created_at: float = field(default_factory=time.time)
@@ -102,16 +175,62 @@ class Room:
     stage: str = "LOBBY"    # LOBBY | COMMIT | REVEAL | HAND | AUDIT
 
     # per-hand
-    community: List[str] = field(default_factory=list)
-    deck: List[str] = field(default_factory=list)
+    community: List[int] = field(default_factory=list)
+    deck: bytes = b""  # card ids in dealing order
+    deck_hash: Optional[bytes] = None  # digest of deck, fixed at shuffle time
     deal_index: int = 0
 
     # audit transcript
-    master_seed_hex: Optional[str] = None
-    transcript: Dict = field(default_factory=dict)
+    master_seed: Optional[bytes] = None  # raw digest; hex only on the wire
+    transcript: Transcript = field(default_factory=Transcript)
+
+    # bumped on every change visible in a state frame
+    state_version: int = 0
+
+    # snapshot of players.values(); rebuilt lazily after join/leave
+    _players_cache: Optional[Tuple[Player, ...]] = field(default=None, init=False, repr=False)
+    # player ids in sorted order, for master-seed derivation and audit
+    _sorted_pids: List[str] = field(default_factory=list, init=False, repr=False)
+    # pids whose socket still works; failed ones are reaped on the next send_state
+    _alive: Set[str] = field(default_factory=set, init=False, repr=False)
+    # (state_version, encoded shared state frame without its closing brace)
+    _state_prefix: Optional[Tuple[int, bytes]] = field(default=None, init=False, repr=False)
+    # encoded audit frame for the current hand, built on first audit
+    _audit_frame: Optional[bytes] = field(default=None, init=False, repr=False)
+    # (sorted (pid, seed, salt) reveals, master seed derived from them)
+    _master_seed_cache: Optional[Tuple[Tuple, bytes]] = field(default=None, init=False, repr=False)
+    # shared state payload, refilled in place by room_shared_state
+    _state_tmpl: Optional[dict] = field(default=None, init=False, repr=False)
+    # a state broadcast is scheduled (mark_dirty) and has not run yet
+    _pending: bool = field(default=False, init=False, repr=False)
 
 rooms: Dict[str, Room] = {}
 
+def players_view(room: Room) -> Tuple[Player, ...]:
+    view = room._players_cache
+    if view is None:
+        view = room._players_cache = tuple(room.players.values())
+    return view
+
+def touch(room: Room):
+    room.state_version += 1
+
+def add_player(room: Room, player: Player):
+    if player.pid not in room.players:
+        bisect.insort(room._sorted_pids, player.pid)
+    room.players[player.pid] = player
+    room._alive.add(player.pid)
+    room._players_cache = None
+    touch(room)
+
+def remove_player(room: Room, pid: str):
+    if room.players.pop(pid, None) is not None:
+        pids = room._sorted_pids
+        del pids[bisect.bisect_left(pids, pid)]
+        room._alive.discard(pid)
+        room._players_cache = None
+        touch(room)
+
 # ----------------------------
 # HTML (casino UI)
 # ----------------------------
@@ -586,12 +705,25 @@ INDEX_HTML = """
     bytes.forEach(x => s += String.fromCharCode(x));
     return btoa(s);
   }
+  function unb64(str){
+    return Uint8Array.from(atob(str), c => c.charCodeAt(0));
+  }
   function utf8bytes(str){ return new TextEncoder().encode(str); }
+  const textDecoder = new TextDecoder();
+  async function inflate(bytes){
+    // zlib-wrapped deflate, as produced by Python's zlib.compress
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("deflate"));
+    return new Uint8Array(await new Response(stream).arrayBuffer());
+  }
 
+  function toHex(bytes){
+    return Array.from(bytes).map(b => b.toString(16).padStart(2,"0")).join("");
+  }
+  async function sha256bytes(str){
+    return new Uint8Array(await crypto.subtle.digest("SHA-256", utf8bytes(str)));
+  }
   async function sha256hex(str){
-    const buf = await crypto.subtle.digest("SHA-256", utf8bytes(str));
-    const arr = Array.from(new Uint8Array(buf));
-    return arr.map(b => b.toString(16).padStart(2,"0")).join("");
+    return toHex(await sha256bytes(str));
   }
 
   // SplitMix64 + deterministic shuffle in JS (for audit verification)
@@ -608,13 +740,18 @@ INDEX_HTML = """
       return u64(z ^ (z >> 31n));
     }
     randbelow(n){
+      // Lemire multiply-shift, matching the server
       if(n <= 0n) throw new Error("n must be > 0");
-      const MOD = 1n << 64n;
-      const limit = MOD - (MOD % n);
-      while(true){
-        const r = this.nextU64();
-        if(r < limit) return r % n;
+      let m = this.nextU64() * n;
+      let low = u64(m);
+      if(low < n){
+        const threshold = ((1n << 64n) - n) % n;
+        while(low < threshold){
+          m = this.nextU64() * n;
+          low = u64(m);
+        }
       }
+      return m >> 64n;
     }
   }
 
@@ -630,19 +767,23 @@ INDEX_HTML = """
     return d;
   }
 
-  async function masterSeedHexFromReveals(reveals){
+  // card id -> label; ids are positions in the unshuffled deck
+  const DECK = makeDeck();
+  function cardNames(ids){ return ids.map(i => DECK[i]); }
+
+  async function masterSeedFromReveals(reveals){
     // reveals: array of {pid, seed, salt} sorted by pid for consistency
     const sorted = reveals.slice().sort((a,b)=>a.pid.localeCompare(b.pid));
     let joined = "";
     for(const r of sorted){
       joined += `${r.pid}:${r.seed}:${r.salt}|`;
     }
-    return await sha256hex(joined);
+    return await sha256bytes(joined);
   }
 
-  async function deterministicShuffleJS(items, masterSeedHex){
-    // Use first 8 bytes of masterSeed as u64 seed
-    const seedU64 = BigInt("0x" + masterSeedHex.slice(0,16));
+  async function deterministicShuffleJS(items, masterSeed){
+    // Use first 8 bytes (big-endian) of masterSeed as u64 seed
+    const seedU64 = new DataView(masterSeed.buffer, masterSeed.byteOffset).getBigUint64(0, false);
     const rng = new SplitMix64(seedU64);
     const arr = items.slice();
     for(let i=arr.length-1; i>0; i--){
@@ -705,7 +846,9 @@ INDEX_HTML = """
   function setSeats(players, myPid){
     // place order: you always in seat0, others fill clockwise
     const seatIds = ["seat0","seat1","seat2","seat3","seat4","seat5"];
-    const pls = Object.values(players || {});
+    // server sends rows of [pid, name, avatar, is_host, commitment, revealed]
+    const pls = (players || []).map(([pid, name, avatar, is_host, commitment, revealed]) =>
+      ({pid, name, avatar, is_host, commitment, revealed}));
     const me = pls.find(p => p.pid === myPid);
     const others = pls.filter(p => p.pid !== myPid);
 
@@ -758,6 +901,7 @@ INDEX_HTML = """
     const proto = (location.protocol === "https:") ? "wss" : "ws";
     const url = `${proto}://${location.host}/ws/${roomCode}/${pid}`;
     ws = new WebSocket(url);
+    ws.binaryType = "arraybuffer";
 
     ws.onopen = () => {
       setNet("CONNECTED");
@@ -766,27 +910,10 @@ INDEX_HTML = """
       q("roomBadge").textContent = "ROOM: " + roomCode;
     };
 
+    // frames are handled strictly in arrival order, even when one needs inflating
+    let inbox = Promise.resolve();
     ws.onmessage = (ev) => {
-      const msg = JSON.parse(ev.data);
-      if(msg.type === "state"){
-        q("stageBadge").textContent = "STAGE: " + msg.stage;
-        q("varBadge").textContent = "VARIANT: " + msg.variant;
-        setSeats(msg.players, myPid);
-        setCommunity(msg.community || []);
-        setHand(msg.my_hole || [], msg.variant);
-        if(msg.audit_pending){
-          q("auditToast").style.display = "inline-flex";
-          q("auditToast").textContent = "AUDIT: PENDING";
-        } else {
-          q("auditToast").style.display = "none";
-        }
-      }
-      if(msg.type === "log"){
-        log(msg.text);
-      }
-      if(msg.type === "audit"){
-        handleAudit(msg);
-      }
+      inbox = inbox.then(() => receive(ev.data)).catch(e => log("Bad frame: " + e));
     };
 
     ws.onclose = () => {
@@ -795,8 +922,50 @@ INDEX_HTML = """
     };
   }
 
+  async function receive(data){
+    // server fan-out arrives as binary UTF-8 JSON frames; the audit frame is
+    // zlib-compressed (first byte 0x78)
+    let text;
+    if(typeof data === "string"){
+      text = data;
+    } else {
+      let bytes = new Uint8Array(data);
+      if(bytes[0] === 0x78) bytes = await inflate(bytes);
+      text = textDecoder.decode(bytes);
+    }
+    const msg = JSON.parse(text);
+    // frames queued while a send was in flight arrive coalesced
+    if(msg.type === "batch"){
+      for(const item of msg.items) handleMessage(item);
+    } else {
+      handleMessage(msg);
+    }
+  }
+
+  function handleMessage(msg){
+    if(msg.type === "state"){
+      q("stageBadge").textContent = "STAGE: " + msg.stage;
+      q("varBadge").textContent = "VARIANT: " + msg.variant;
+      setSeats(msg.players, myPid);
+      setCommunity(cardNames(msg.community || []));
+      setHand(cardNames(msg.my_hole || []), msg.variant);
+      if(msg.audit_pending){
+        q("auditToast").style.display = "inline-flex";
+        q("auditToast").textContent = "AUDIT: PENDING";
+      } else {
+        q("auditToast").style.display = "none";
+      }
+    }
+    if(msg.type === "log"){
+      log(msg.text);
+    }
+    if(msg.type === "audit"){
+      handleAudit(msg);
+    }
+  }
+
   async function handleAudit(msg){
-    // msg has: reveals[{pid, seed, salt}], deck[], transcript, master_seed_hex
+    // msg has: reveals[{pid, seed, salt}], deck_b64, transcript, master_seed_hex
     log("AUDIT RECEIVED. Verifying...");
     q("auditToast").style.display = "inline-flex";
     q("auditToast").textContent = "AUDIT: VERIFYING…";
@@ -805,15 +974,17 @@ INDEX_HTML = """
     // We don't have the commitments here (in a real UI we'd add them),
     // so we verify the deterministic shuffle only.
 
-    const computedMaster = await masterSeedHexFromReveals(msg.reveals);
-    const okMaster = (computedMaster === msg.master_seed_hex);
-    const deck2 = await deterministicShuffleJS(makeDeck(), computedMaster);
+    const masterSeed = await masterSeedFromReveals(msg.reveals);
+    const okMaster = (toHex(masterSeed) === msg.master_seed_hex);
+    // shuffle card ids 0..51 and compare with the server's packed deck
+    const deck2 = await deterministicShuffleJS(DECK.map((_, i) => i), masterSeed);
+    const deck = Array.from(unb64(msg.deck_b64));
 
     let okDeck = true;
-    if(deck2.length !== msg.deck.length) okDeck = false;
+    if(deck2.length !== deck.length) okDeck = false;
     else{
       for(let i=0; i<deck2.length; i++){
-        if(deck2[i] !== msg.deck[i]){ okDeck = false; break; }
+        if(deck2[i] !== deck[i]){ okDeck = false; break; }
       }
     }
 
@@ -914,12 +1085,54 @@ INDEX_HTML = """
 </html>
 """
 
+# Encode and compress the page once; every GET / just hands out the bytes
+# for the best encoding the client accepts.
+INDEX_HTML_BYTES = INDEX_HTML.encode("utf-8")
+INDEX_ETAG = '"' + sha256_hex(INDEX_HTML)[:32] + '"'
+
+def _index_variant(body: bytes, coding: Optional[str]) -> Tuple[bytes, Dict[str, str]]:
+    etag = INDEX_ETAG if coding is None else INDEX_ETAG[:-1] + "-" + coding + '"'
+    headers = {"content-length": str(len(body)), "etag": etag, "vary": "Accept-Encoding"}
+    if coding is not None:
+        headers["content-encoding"] = coding
+    return body, headers
+
+INDEX_VARIANTS: Dict[Optional[str], Tuple[bytes, Dict[str, str]]] = {
+    None: _index_variant(INDEX_HTML_BYTES, None),
+    "gzip": _index_variant(gzip.compress(INDEX_HTML_BYTES, compresslevel=9, mtime=0), "gzip"),
+}
+if brotli is not None:
+    INDEX_VARIANTS["br"] = _index_variant(brotli.compress(INDEX_HTML_BYTES, quality=11), "br")
+
+def _pick_encoding(accept_encoding: str) -> Optional[str]:
+    # "*" only stands for codings the header does not name, so a coding
+    # sent with q=0 stays refused even when "*" is accepted (RFC 9110 12.5.3).
+    accepted = set()
+    refused = set()
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.partition(";")
+        token = token.strip()
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            refused.add(token)
+        else:
+            accepted.add(token)
+    for coding in ("br", "gzip"):
+        if coding in INDEX_VARIANTS and (
+            coding in accepted or ("*" in accepted and coding not in refused)
+        ):
+            return coding
+    return None
+
 # ----------------------------
 # API routes
 # ----------------------------
 @app.get("/")
-def index():
-    return HTMLResponse(INDEX_HTML)
+def index(request: Request):
+    body, headers = INDEX_VARIANTS[_pick_encoding(request.headers.get("accept-encoding", ""))]
+    if request.headers.get("if-none-match") == headers["etag"]:
+        return Response(status_code=304, headers={"etag": headers["etag"], "vary": "Accept-Encoding"})
+    return Response(content=body, media_type="text/html; charset=utf-8", headers=headers)
 
 @app.post("/api/create")
 def create_room():
@@ -930,119 +1143,424 @@ def create_room():
 # ----------------------------
 # WebSocket game server
 # ----------------------------
-async def broadcast(room: Room, payload: dict):
-    dead = []
-    for p in room.players.values():
-        if p.ws is None:
+# Every socket has its own bounded outbound queue and writer task. Frames
+# that pile up while a send is in flight go out together as one batch frame;
+# a client that falls OUT_QUEUE_SIZE frames behind is dropped.
+OUT_QUEUE_SIZE = 256
+MAX_BATCH = 32
+
+# Client messages are small control frames; anything bigger is not parsed.
+MAX_INBOUND_FRAME = 4096
+
+if orjson is not None:
+    encode = orjson.dumps
+    decode = orjson.loads
+else:
+    def encode(payload: object) -> bytes:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    decode = json.loads
+
+# close tasks in flight; asyncio keeps only weak references to tasks
+_closing: Set[asyncio.Task] = set()
+
+async def _close_quietly(ws: WebSocket, code: int):
+    try:
+        await ws.close(code=code)
+    except Exception:
+        pass
+
+def drop_player(room: Room, p: Player):
+    # Stop serving a client whose socket failed or fell too far behind. It
+    # only leaves the alive set here; send_state or the next deal reaps it,
+    # and its handler sees the close and finishes the usual leave path.
+    if room.players.get(p.pid) is p:
+        room._alive.discard(p.pid)
+    if p.out_queue is None:
+        return
+    p.out_queue = None
+    if p.writer is not None and p.writer is not asyncio.current_task():
+        p.writer.cancel()
+    if p.ws is not None:
+        task = asyncio.ensure_future(_close_quietly(p.ws, 1011))
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+
+def enqueue(room: Room, p: Player, frame: bytes):
+    if p.out_queue is None:
+        return
+    try:
+        p.out_queue.put_nowait(frame)
+    except asyncio.QueueFull:
+        drop_player(room, p)
+
+def _batch(run: List[bytes]) -> bytes:
+    # one JSON frame as-is, several as {"type":"batch","items":[...]}
+    if len(run) == 1:
+        return run[0]
+    return b'{"type":"batch","items":[' + b",".join(run) + b"]}"
+
+def _coalesce(batch: List[bytes]) -> List[bytes]:
+    # Adjacent JSON frames are merged into one batch frame; anything else
+    # (the zlib-compressed audit) goes out on its own, in order.
+    out: List[bytes] = []
+    run: List[bytes] = []
+    for frame in batch:
+        if frame[:1] == b"{":
+            run.append(frame)
             continue
+        if run:
+            out.append(_batch(run))
+            run = []
+        out.append(frame)
+    if run:
+        out.append(_batch(run))
+    return out
+
+async def writer(room: Room, p: Player):
+    queue = p.out_queue
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < MAX_BATCH and not queue.empty():
+            batch.append(queue.get_nowait())
         try:
-            await p.ws.send_text(json.dumps(payload))
+            for data in _coalesce(batch):
+                await p.ws.send_bytes(data)
         except Exception:
-            dead.append(p.pid)
-    for pid in dead:
-        room.players.pop(pid, None)
-
-def room_public_state(room: Room, pid: str) -> dict:
-    players = {}
-    for p in room.players.values():
-        players[p.pid] = {
-            "pid": p.pid,
-            "name": p.name,
-            "avatar": p.avatar,
-            "is_host": p.is_host,
-            "commitment": p.commitment,
-            "revealed": bool(p.seed and p.salt) if room.stage in ("HAND","AUDIT") else False,  # keep private until audit/hand stage
+            drop_player(room, p)
+            return
+
+_LOG_PREFIX = b'{"type":"log","text":'
+
+def log_frame(text: str) -> bytes:
+    # {"type":"log","text":...} without building and encoding a dict
+    return _LOG_PREFIX + encode(text) + b"}"
+
+def broadcast(room: Room, frame: bytes):
+    # Frames are encoded once by the caller; every socket queues the same bytes
+    for p in players_view(room):
+        enqueue(room, p, frame)
+
+def room_shared_state(room: Room) -> dict:
+    # Everything in a state frame except the recipient's own hole cards.
+    # The same dict is refilled on every call; callers encode it right away.
+    tmpl = room._state_tmpl
+    if tmpl is None:
+        tmpl = room._state_tmpl = {
+            "type":"state",
+            "room": room.code,
+            "stage": None,
+            "variant": None,
+            "players": [],
+            "community": None,
+            "audit_pending": False,
         }
-
-    me = room.players.get(pid)
-    my_hole = me.hole if me else []
-
+    reveal_visible = room.stage in ("HAND","AUDIT")  # keep private until audit/hand stage
+    # one row per seat, in join order: [pid, name, avatar, is_host, commitment, revealed]
+    rows = tmpl["players"]
+    rows.clear()
+    rows.extend(
+        (p.pid, p.name, p.avatar, p.is_host, p.commitment.hex() if p.commitment else None, reveal_visible and p._revealed)
+        for p in players_view(room)
+    )
+    tmpl["stage"] = room.stage
+    tmpl["variant"] = room.variant
+    tmpl["community"] = room.community
     # show "audit pending" toast if stage is HAND and audit not yet broadcast
-    audit_pending = (room.stage == "HAND")
-
-    return {
-        "type":"state",
-        "room": room.code,
-        "stage": room.stage,
-        "variant": room.variant,
-        "players": players,
-        "community": room.community,
-        "my_hole": my_hole,
-        "audit_pending": audit_pending,
-    }
-
-def compute_master_seed(room: Room) -> Tuple[bytes, str]:
-    # Combine reveals sorted by pid for determinism
-    items = []
-    for pid, p in sorted(room.players.items(), key=lambda kv: kv[0]):
-        if not (p.seed and p.salt):
+    tmpl["audit_pending"] = (room.stage == "HAND")
+    return tmpl
+
+def room_state_prefix(room: Room) -> bytes:
+    # The shared frame is encoded once per state_version; each recipient's
+    # frame is this prefix plus their own hole cards.
+    cached = room._state_prefix
+    if cached is None or cached[0] != room.state_version:
+        body = encode(room_shared_state(room))
+        cached = room._state_prefix = (room.state_version, body[:-1] + b',"my_hole":')
+    return cached[1]
+
+def state_frame(room: Room, pid: str) -> bytes:
+    me = room.players.get(pid)
+    return room_state_prefix(room) + encode(me.hole if me else []) + b"}"
+
+def compute_master_seed(room: Room) -> bytes:
+    # Combine reveals sorted by pid for determinism:
+    # sha256("pid:seed:salt|" for each player)
+    players = room.players
+    key = tuple((pid, players[pid].seed, players[pid].salt) for pid in room._sorted_pids)
+    cached = room._master_seed_cache
+    if cached is not None and cached[0] == key:
+        # new_hand with unchanged reveals derives the same seed
+        return cached[1]
+    h = _SHA_PROTO.copy()
+    for pid, seed, salt in key:
+        if not (seed and salt):
             raise ValueError("Missing reveal for player")
-        items.append(f"{pid}:{p.seed}:{p.salt}")
-    joined = "|".join(items) + "|"
-    digest = sha256_bytes(joined.encode("utf-8"))
-    return digest, digest.hex()
+        h.update(pid.encode("utf-8"))
+        h.update(b":")
+        h.update(seed)
+        h.update(b":")
+        h.update(salt)
+        h.update(b"|")
+    digest = h.digest()
+    room._master_seed_cache = (key, digest)
+    return digest
 
 def reset_hand(room: Room):
     room.community = []
-    room.deck = []
+    room.deck = b""
+    room.deck_hash = None
+    room._audit_frame = None
     room.deal_index = 0
-    room.master_seed_hex = None
-    room.transcript = {}
-    for p in room.players.values():
+    room.master_seed = None
+    room.transcript = Transcript()
+    for p in players_view(room):
         p.hole = []
+    touch(room)
 
 def deal_hole(room: Room):
     # create and shuffle deck based on master seed
-    master_bytes, master_hex = compute_master_seed(room)
-    room.master_seed_hex = master_hex
+    master_bytes = compute_master_seed(room)
+    room.master_seed = master_bytes
 
-    deck = make_deck()
-    room.deck = deterministic_shuffle(deck, master_bytes)
+    room.deck = shuffled_deck(master_bytes)
+    room.deck_hash = deck_digest(room.deck)
     room.deal_index = 0
 
     # record transcript indices used
-    room.transcript = {
-        "variant": room.variant,
-        "holes": {},
-        "community_indices": [],
-        "created_at": time.time(),
-    }
+    room.transcript = Transcript(variant=room.variant)
 
     # Deal hole cards per variant (Texas=2, Omaha=4)
     hole_n = 2 if room.variant == "TEXAS" else 4
 
-    # Dealing order: sorted by join order = insertion order of dict (Python 3.7+ keeps order)
-    order = list(room.players.values())
-    for p in order:
-        p.hole = []
-        room.transcript["holes"][p.pid] = []
-
-    for _ in range(hole_n):
-        for p in order:
-            idx = room.deal_index
-            card = room.deck[idx]
-            p.hole.append(card)
-            room.transcript["holes"][p.pid].append(idx)
-            room.deal_index += 1
+    # Dealing order: sorted by join order = insertion order of dict (Python 3.7+ keeps order).
+    # Round-robin dealing gives seat i every n-th card starting at i.
+    order = players_view(room)
+    n = len(order)
+    end = hole_n * n
+    if end > len(room.deck):
+        raise ValueError("Not enough cards for this many players")
+    for i, p in enumerate(order):
+        p.hole = list(room.deck[i:end:n])
+        room.transcript.holes[p.pid] = array.array("B", range(i, end, n))
+    room.deal_index = end
+    touch(room)
 
 def deal_community(room: Room, count: int):
     # No burn in this prototype; easy to add later
-    for _ in range(count):
-        idx = room.deal_index
-        card = room.deck[idx]
-        room.community.append(card)
-        room.transcript["community_indices"].append(idx)
-        room.deal_index += 1
-
-async def send_state(room: Room):
+    start = room.deal_index
+    end = start + count
+    if end > len(room.deck):
+        raise ValueError("Not enough cards left in deck")
+    room.community.extend(room.deck[start:end])
+    room.transcript.community_indices.extend(range(start, end))
+    room.deal_index = end
+    touch(room)
+
+AUDIT_ZLIB_LEVEL = 6
+
+def audit_frame(room: Room) -> bytes:
+    # Encoded and zlib-compressed once per hand; every recipient (and anyone
+    # joining during the AUDIT stage) gets the same bytes.
+    if room._audit_frame is None:
+        # Prepare reveal payload (public now)
+        reveals = []
+        for pid in room._sorted_pids:
+            p = room.players[pid]
+            reveals.append({
+                "pid": pid,
+                "seed": p.seed.decode("utf-8") if p.seed is not None else None,
+                "salt": p.salt.decode("utf-8") if p.salt is not None else None,
+            })
+
+        room._audit_frame = zlib.compress(encode({
+            "type":"audit",
+            "master_seed_hex": room.master_seed.hex(),
+            # one byte per card id instead of a 52-element array
+            "deck_b64": base64.b64encode(room.deck).decode("ascii"),
+            "deck_hash": room.deck_hash.hex(),
+            "reveals": reveals,
+            "transcript": room.transcript.to_json(),
+        }), AUDIT_ZLIB_LEVEL)
+    return room._audit_frame
+
+def reap_dead(room: Room) -> bool:
+    # True if any seat was removed
+    if len(room._alive) == len(room.players):
+        return False
+    for pid in [pid for pid in room.players if pid not in room._alive]:
+        remove_player(room, pid)
+    return True
+
+def send_state(room: Room):
     # send to each player so they get private hole cards
-    for pid, p in list(room.players.items()):
-        if p.ws is None:
-            continue
-        try:
-            await p.ws.send_text(json.dumps(room_public_state(room, pid)))
-        except Exception:
-            room.players.pop(pid, None)
+    room._pending = False
+    reap_dead(room)
+    for p in players_view(room):
+        enqueue(room, p, state_frame(room, p.pid))
+
+def _flush_state(room: Room):
+    if room._pending:
+        send_state(room)
+
+def mark_dirty(room: Room):
+    # Schedule one send_state for the next loop iteration; everything that
+    # changes the room before then goes out in that single state frame.
+    # Deal paths call send_state directly so state lands before later frames.
+    if not room._pending:
+        room._pending = True
+        asyncio.get_running_loop().call_soon(_flush_state, room)
+
+# ----------------------------
+# Message handlers
+# ----------------------------
+@dataclass(slots=True)
+class Ctx:
+    # one per connection; msg is replaced for every inbound message
+    room: Room
+    player: Player
+    msg: dict = field(default_factory=dict)
+
+UNKNOWN_MESSAGE = log_frame("Unknown message.")
+HOST_ONLY = log_frame("Host only.")
+
+def _h_join(ctx: Ctx):
+    room, player, msg = ctx.room, ctx.player, ctx.msg
+    player.name = (msg.get("name") or "Player")[:18]
+    player.avatar = (msg.get("avatar") or "")[:2]
+    touch(room)
+    broadcast(room, log_frame(f"{player.name} joined the table."))
+    mark_dirty(room)
+
+def _h_commit(ctx: Ctx):
+    room, player, msg = ctx.room, ctx.player, ctx.msg
+    commitment = msg.get("commitment")
+    try:
+        if not commitment or len(commitment) != 64:
+            raise ValueError(commitment)
+        commitment_bytes = bytes.fromhex(commitment)
+    except (TypeError, ValueError):
+        enqueue(room, player, log_frame("Invalid commitment."))
+        return
+    player.commitment = commitment_bytes
+    broadcast(room, log_frame(f"{player.name} committed."))
+    # Auto move to COMMIT stage if not started
+    if room.stage == "LOBBY":
+        room.stage = "COMMIT"
+    touch(room)
+    mark_dirty(room)
+
+def _h_reveal(ctx: Ctx):
+    room, player, msg = ctx.room, ctx.player, ctx.msg
+    seed = (msg.get("seed") or "").encode("utf-8")
+    salt = (msg.get("salt") or "").encode("utf-8")
+    if not player.commitment:
+        enqueue(room, player, log_frame("Commit first."))
+        return
+    # verify commitment
+    if commitment_digest(seed, salt) != player.commitment:
+        enqueue(room, player, log_frame("Reveal does not match commitment ❌"))
+        return
+    player.seed = seed
+    player.salt = salt
+    player._revealed = bool(seed and salt)
+    room._master_seed_cache = None
+    broadcast(room, log_frame(f"{player.name} revealed to server."))
+    room.stage = "REVEAL"
+    touch(room)
+    mark_dirty(room)
+
+def _h_start_hand(ctx: Ctx):
+    room, player, msg = ctx.room, ctx.player, ctx.msg
+    # dropped clients must not be counted, dealt in, or seeded; the early
+    # returns below send no state, so push the removed seats separately
+    if reap_dead(room):
+        mark_dirty(room)
+    if not player.is_host:
+        enqueue(room, player, HOST_ONLY)
+        return
+    variant = (msg.get("variant") or "TEXAS").upper()
+    if variant not in ("TEXAS","OMAHA"):
+        variant = "TEXAS"
+    room.variant = variant
+    touch(room)
+
+    # require all players to have commits + reveals
+    if len(room.players) < 2:
+        enqueue(room, player, log_frame("Need at least 2 players."))
+        return
+    for p in players_view(room):
+        if not p.commitment:
+            enqueue(room, player, log_frame(f"{p.name} has not committed."))
+            return
+        if not (p.seed and p.salt):
+            enqueue(room, player, log_frame(f"{p.name} has not revealed to server."))
+            return
+    reset_hand(room)
+    deal_hole(room)
+    room.stage = "HAND"
+    touch(room)
+    broadcast(room, log_frame(f"New hand started • {room.variant} • Dealt hole cards."))
+    send_state(room)
+
+def _h_deal(ctx: Ctx):
+    room, player, msg = ctx.room, ctx.player, ctx.msg
+    if not player.is_host:
+        enqueue(room, player, HOST_ONLY)
+        return
+    if room.stage != "HAND" or not room.deck:
+        enqueue(room, player, log_frame("Start a hand first."))
+        return
+    what = msg.get("what")
+    if what == "flop" and len(room.community) == 0:
+        deal_community(room, 3)
+        broadcast(room, log_frame("Flop dealt."))
+    elif what == "turn" and len(room.community) == 3:
+        deal_community(room, 1)
+        broadcast(room, log_frame("Turn dealt."))
+    elif what == "river" and len(room.community) == 4:
+        deal_community(room, 1)
+        broadcast(room, log_frame("River dealt."))
+    else:
+        enqueue(room, player, log_frame("That deal action is not valid right now."))
+    send_state(room)
+
+def _h_new_hand(ctx: Ctx):
+    room, player = ctx.room, ctx.player
+    if reap_dead(room):
+        mark_dirty(room)
+    if not player.is_host:
+        enqueue(room, player, HOST_ONLY)
+        return
+    # keep commitments and reveals; just reset visible cards
+    reset_hand(room)
+    room.stage = "HAND"
+    deal_hole(room)
+    broadcast(room, log_frame("New hand (same commitments) • Dealt hole cards."))
+    send_state(room)
+
+def _h_audit(ctx: Ctx):
+    room, player = ctx.room, ctx.player
+    if room.stage != "HAND" or not room.deck or not room.master_seed:
+        enqueue(room, player, log_frame("Nothing to audit yet."))
+        return
+
+    frame = audit_frame(room)
+    room.stage = "AUDIT"
+    touch(room)
+    broadcast(room, log_frame("AUDIT broadcast: seeds revealed. Verify now."))
+    broadcast(room, frame)
+    send_state(room)
+
+# message type -> handler; anything else gets UNKNOWN_MESSAGE
+HANDLERS: Dict[str, Callable[[Ctx], None]] = {
+    "join": _h_join,
+    "commit": _h_commit,
+    "reveal": _h_reveal,
+    "start_hand": _h_start_hand,
+    "deal": _h_deal,
+    "new_hand": _h_new_hand,
+    "audit": _h_audit,
+}
 
 @app.websocket("/ws/{code}/{pid}")
 async def ws(code: str, pid: str, websocket: WebSocket):
@@ -1056,155 +1574,83 @@ async def ws(code: str, pid: str, websocket: WebSocket):
     # temporary player until join message sets details
     player = Player(pid=pid, name="Player", avatar="")
     player.ws = websocket
+    player.out_queue = asyncio.Queue(maxsize=OUT_QUEUE_SIZE)
+    player.writer = asyncio.create_task(writer(room, player))
 
     # host = first player
     if len(room.players) == 0:
         player.is_host = True
 
-    room.players[pid] = player
+    add_player(room, player)
 
     # initial state
-    await websocket.send_text(json.dumps(room_public_state(room, pid)))
-    await broadcast(room, {"type":"log", "text": f"Player connected: {pid[:8]}…"})
+    enqueue(room, player, state_frame(room, pid))
+    if room.stage == "AUDIT" and room._audit_frame is not None:
+        enqueue(room, player, room._audit_frame)
+    broadcast(room, log_frame(f"Player connected: {pid[:8]}…"))
 
+    ctx = Ctx(room, player)
     try:
         while True:
-            raw = await websocket.receive_text()
-            msg = json.loads(raw)
-            mtype = msg.get("type", "")
-
-            if mtype == "join":
-                player.name = (msg.get("name") or "Player")[:18]
-                player.avatar = (msg.get("avatar") or "")[:2]
-                await broadcast(room, {"type":"log", "text": f"{player.name} joined the table."})
-                await send_state(room)
-
-            elif mtype == "commit":
-                commitment = msg.get("commitment")
-                if not commitment or len(commitment) != 64:
-                    await websocket.send_text(json.dumps({"type":"log", "text":"Invalid commitment."}))
-                    continue
-                player.commitment = commitment
-                await broadcast(room, {"type":"log", "text": f"{player.name} committed."})
-                # Auto move to COMMIT stage if not started
-                if room.stage == "LOBBY":
-                    room.stage = "COMMIT"
-                await send_state(room)
-
-            elif mtype == "reveal":
-                seed = msg.get("seed") or ""
-                salt = msg.get("salt") or ""
-                if not player.commitment:
-                    await websocket.send_text(json.dumps({"type":"log", "text":"Commit first."}))
-                    continue
-                # verify commitment
-                calc = sha256_hex(seed + "|" + salt)
-                if calc != player.commitment:
-                    await websocket.send_text(json.dumps({"type":"log", "text":"Reveal does not match commitment ❌"}))
-                    continue
-                player.seed = seed
-                player.salt = salt
-                await broadcast(room, {"type":"log", "text": f"{player.name} revealed to server."})
-                room.stage = "REVEAL"
-                await send_state(room)
-
-            elif mtype == "start_hand":
-                if not player.is_host:
-                    await websocket.send_text(json.dumps({"type":"log", "text":"Host only."}))
-                    continue
-                variant = (msg.get("variant") or "TEXAS").upper()
-                if variant not in ("TEXAS","OMAHA"):
-                    variant = "TEXAS"
-                room.variant = variant
-
-                # require all players to have commits + reveals
-                if len(room.players) < 2:
-                    await websocket.send_text(json.dumps({"type":"log", "text":"Need at least 2 players."}))
-                    continue
-                for p in room.players.values():
-                    if not p.commitment:
-                        await websocket.send_text(json.dumps({"type":"log", "text": f"{p.name} has not committed."}))
-                        break
-                    if not (p.seed and p.salt):
-                        await websocket.send_text(json.dumps({"type":"log", "text": f"{p.name} has not revealed to server."}))
-                        break
-                else:
-                    reset_hand(room)
-                    deal_hole(room)
-                    room.stage = "HAND"
-                    await broadcast(room, {"type":"log", "text": f"New hand started • {room.variant} • Dealt hole cards."})
-                    await send_state(room)
-
-            elif mtype == "deal":
-                if not player.is_host:
-                    await websocket.send_text(json.dumps({"type":"log", "text":"Host only."}))
-                    continue
-                if room.stage != "HAND" or not room.deck:
-                    await websocket.send_text(json.dumps({"type":"log", "text":"Start a hand first."}))
-                    continue
-                what = msg.get("what")
-                if what == "flop" and len(room.community) == 0:
-                    deal_community(room, 3)
-                    await broadcast(room, {"type":"log", "text":"Flop dealt."})
-                elif what == "turn" and len(room.community) == 3:
-                    deal_community(room, 1)
-                    await broadcast(room, {"type":"log", "text":"Turn dealt."})
-                elif what == "river" and len(room.community) == 4:
-                    deal_community(room, 1)
-                    await broadcast(room, {"type":"log", "text":"River dealt."})
-                else:
-                    await websocket.send_text(json.dumps({"type":"log", "text":"That deal action is not valid right now."}))
-                await send_state(room)
-
-            elif mtype == "new_hand":
-                if not player.is_host:
-                    await websocket.send_text(json.dumps({"type":"log", "text":"Host only."}))
-                    continue
-                # keep commitments and reveals; just reset visible cards
-                reset_hand(room)
-                room.stage = "HAND"
-                deal_hole(room)
-                await broadcast(room, {"type":"log", "text":"New hand (same commitments) • Dealt hole cards."})
-                await send_state(room)
-
-            elif mtype == "audit":
-                if room.stage != "HAND" or not room.deck or not room.master_seed_hex:
-                    await websocket.send_text(json.dumps({"type":"log", "text":"Nothing to audit yet."}))
-                    continue
-
-                # Prepare reveal payload (public now)
-                reveals = []
-                for pid2, p2 in sorted(room.players.items(), key=lambda kv: kv[0]):
-                    reveals.append({"pid": pid2, "seed": p2.seed, "salt": p2.salt})
-
-                deck_hash = hashlib.sha256(("|".join(room.deck) + "|").encode("utf-8")).hexdigest()
-
-                payload = {
-                    "type":"audit",
-                    "master_seed_hex": room.master_seed_hex,
-                    "deck": room.deck,
-                    "deck_hash": deck_hash,
-                    "reveals": reveals,
-                    "transcript": room.transcript,
-                }
-                room.stage = "AUDIT"
-                await broadcast(room, {"type":"log", "text":"AUDIT broadcast: seeds revealed. Verify now."})
-                await broadcast(room, payload)
-                await send_state(room)
-
+            # Take text or binary frames as they come; the parser reads either
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            text = message.get("text")
+            if text is None:
+                raw = message.get("bytes") or b""
+            else:
+                # the cap is in bytes, so text frames are measured as UTF-8
+                raw = text.encode("utf-8")
+            if len(raw) > MAX_INBOUND_FRAME:
+                enqueue(room, player, log_frame("Message too large."))
+                continue
+            msg = decode(raw)
+            mtype = msg.get("type")
+            # a list or object "type" is valid JSON but cannot key the table
+            handler = HANDLERS.get(mtype) if isinstance(mtype, str) else None
+            if handler is None:
+                enqueue(room, player, UNKNOWN_MESSAGE)
             else:
-                await websocket.send_text(json.dumps({"type":"log", "text":"Unknown message."}))
+                ctx.msg = msg
+                handler(ctx)
+                # Handlers never await, so a burst of buffered messages would
+                # fill everyone's queue before any writer ran; queue depth
+                # must measure how slow a recipient is, not a sender's burst.
+                await asyncio.sleep(0)
 
     except WebSocketDisconnect:
-        room.players.pop(pid, None)
-        await broadcast(room, {"type":"log", "text": f"{player.name} left."})
+        remove_player(room, pid)
+        broadcast(room, log_frame(f"{player.name} left."))
         # If host left, promote first remaining player
-        if not any(p.is_host for p in room.players.values()) and len(room.players) > 0:
-            first = next(iter(room.players.values()))
+        remaining = players_view(room)
+        if remaining and not any(p.is_host for p in remaining):
+            first = remaining[0]
             first.is_host = True
-            await broadcast(room, {"type":"log", "text": f"{first.name} is now HOST."})
-        await send_state(room)
+            touch(room)
+            broadcast(room, log_frame(f"{first.name} is now HOST."))
+        mark_dirty(room)
     except Exception as e:
-        room.players.pop(pid, None)
-        await broadcast(room, {"type":"log", "text": f"Error: {str(e)}"})
-        await send_state(room)
+        remove_player(room, pid)
+        broadcast(room, log_frame(f"Error: {str(e)}"))
+        mark_dirty(room)
+    finally:
+        player.out_queue = None
+        player.writer.cancel()
+
+if __name__ == "__main__":
+    import os
+
+    import uvicorn
+
+    # "auto" picks uvloop and httptools when they are installed and falls back
+    # to asyncio/h11 otherwise. Rooms live in this process's memory, so keep a
+    # single worker; more workers would split players of one room apart.
+    uvicorn.run(
+        "app:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8000")),
+        loop="auto",
+        http="auto",
+        ws="auto",
+    )